@@ -71,6 +71,22 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Use pop(..., None) so we never raise KeyError
         removed = domain_data.pop(vin, None)
         if removed is None:
+            # A reconfigure may have just changed the VIN: entry.data
+            # already carries the new one while hass.data is still keyed
+            # by the old, so fall back to matching by entry_id.
+            for key, value in list(domain_data.items()):
+                if value.get("entry_id") == entry.entry_id:
+                    removed = domain_data.pop(key)
+                    break
+        if removed is not None:
+            # The RAR/speculative sessions are owned by this entry
+            # (created in sensor.py) – close them so reloads don't pile
+            # up idle connection pools until HA stops.
+            for key in ("rar_session", "spec_session"):
+                owned_session = removed.get(key)
+                if owned_session is not None:
+                    await owned_session.close()
+        else:
             _LOGGER.debug(
                 "async_unload_entry: VIN %s not found in hass.data[%s], "
                 "domain keys were: %s",
@@ -1,14 +1,52 @@
+from __future__ import annotations
+
 import asyncio
 import io
 
-import pytesseract
-from PIL import Image, ImageFilter, ImageOps, ImageStat
-
 DIGITS_ONLY_CFG = "--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789"
 
+# NOTE: pytesseract / PIL / numpy / cv2 are all imported lazily inside the
+# functions below. This module is only a fallback for advanced users – the
+# default remote-OCR path never calls it, so HA startup should not pay the
+# import cost (~10MB resident and several hundred ms) for these libraries.
+
+
+def _clean_cv2(raw: bytes) -> "Image.Image":
+    """Denoise and Otsu-threshold the CAPTCHA using OpenCV's C kernels.
+
+    Much faster (and more accurate) than the PIL pipeline: medianBlur,
+    GaussianBlur and the Otsu threshold all run as SIMD-optimized native
+    code instead of per-pixel Python. Raises ImportError when OpenCV or
+    NumPy is not installed.
+    """
+    import cv2
+    import numpy as np
+    from PIL import Image
+
+    arr = np.frombuffer(raw, np.uint8)
+    img = cv2.imdecode(arr, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError("cv2 could not decode CAPTCHA image")
+
+    img = cv2.medianBlur(img, 3)
+    img = cv2.GaussianBlur(img, (0, 0), 0.5)
+    _, bw = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    bw = cv2.resize(bw, None, fx=2, fy=2, interpolation=cv2.INTER_LANCZOS4)
 
-def _clean(img: Image.Image) -> Image.Image:
-    """Aggressively denoise and threshold the CAPTCHA image for OCR."""
+    return Image.fromarray(bw, mode="L")
+
+
+def _clean(img: "Image.Image") -> "Image.Image":
+    """Aggressively denoise and threshold the CAPTCHA image for OCR.
+
+    PIL fallback used only when OpenCV is not installed.
+    """
+    from PIL import Image, ImageFilter, ImageOps, ImageStat
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
 
     img = ImageOps.grayscale(img)
     img = ImageOps.autocontrast(img, cutoff=5)
@@ -18,7 +56,14 @@ def _clean(img: Image.Image) -> Image.Image:
     # Adaptive threshold based on image brightness
     mean = ImageStat.Stat(img).mean[0]
     threshold = max(100, min(170, int(mean)))
-    img = img.point(lambda p: 255 if p > threshold else 0, "1")
+    if np is not None:
+        # One C-level comparison over the whole buffer instead of calling
+        # a Python lambda once per pixel through img.point().
+        arr = np.asarray(img)
+        out = np.where(arr > threshold, np.uint8(255), np.uint8(0))
+        img = Image.fromarray(out, mode="L").convert("1")
+    else:
+        img = img.point(lambda p: 255 if p > threshold else 0, "1")
 
     return img.resize((img.width * 2, img.height * 2), Image.LANCZOS)
 
@@ -35,8 +80,15 @@ async def solve_captcha_image(raw: bytes) -> str:
     of raising TesseractNotFoundError.
     """
     def _ocr() -> str:
-        img = Image.open(io.BytesIO(raw))
-        img = _clean(img)
+        # Imported lazily: the default (remote OCR API) path never calls
+        # this, so HA startup does not pay the pytesseract import cost.
+        import pytesseract
+        from PIL import Image
+
+        try:
+            img = _clean_cv2(raw)
+        except ImportError:
+            img = _clean(Image.open(io.BytesIO(raw)))
         try:
             return pytesseract.image_to_string(img, config=DIGITS_ONLY_CFG).strip()
         except pytesseract.TesseractNotFoundError:
@@ -1,9 +1,55 @@
-import voluptuous as vol                     # Form/schema helper for HA config flows
+import re                                    # VIN format validation
+from functools import cache                  # Schemas built once, on first UI open
+
 from homeassistant import config_entries     # Base classes for ConfigFlow & OptionsFlow
 from homeassistant.const import CONF_NAME    # Standard constant for "name"
 from homeassistant.core import callback      # Used by async_get_options_flow
 
-from .const import DOMAIN                    # Our integration domain string
+from .const import DOMAIN, build_ocr_url     # Our integration domain string + URL helper
+
+# ISO 3779 VIN: 17 chars, no I/O/Q. Checked before touching unique_id /
+# config-entry storage so invalid input never costs a storage rewrite.
+_VIN_RE = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
+
+# voluptuous is imported inside the cached builders below, so HA startup
+# (which imports every config_flow module during the manifest scan) does
+# not load it until someone actually opens this integration's UI. Each
+# schema is still built exactly once.
+
+
+@cache
+def _user_schema():
+    """Schema for the user + reconfigure forms – the layout never changes."""
+    import voluptuous as vol
+
+    return vol.Schema(
+        {
+            vol.Required(CONF_NAME): str,   # Friendly name of the integration
+            vol.Required("vin"): str,       # VIN to monitor
+            # NEW: tesseract_ip instead of ocr_api_key
+            #
+            # You can enter either:
+            #   - just an IP/hostname → e.g. 192.168.68.144
+            #   - or a full URL     → e.g. http://192.168.68.144:8000/ocr/file?lang=eng
+            #
+            # We keep it optional so the integration still works with manual captcha
+            # or with a default URL from const.py / sensor.py.
+            vol.Optional("tesseract_ip", default=""): str,
+        }
+    )
+
+
+@cache
+def _options_schema():
+    """Schema for the options dialog – the current value is injected via
+    add_suggested_values_to_schema instead of a per-render default= marker."""
+    import voluptuous as vol
+
+    return vol.Schema(
+        {
+            vol.Optional("tesseract_ip", default=""): str,
+        }
+    )
 
 
 class RarItpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -19,35 +65,107 @@ class RarItpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             #   - vin
             #   - tesseract_ip (optional)
 
+            # Normalize the VIN so entries differing only by case or
+            # whitespace can't both be created.
+            vin = user_input["vin"].strip().upper()
+            if not _VIN_RE.match(vin):
+                # Re-render with what the user typed instead of a blank
+                # form – same pattern as the reconfigure step below.
+                return self.async_show_form(
+                    step_id="user",
+                    data_schema=self.add_suggested_values_to_schema(
+                        _user_schema(), user_input
+                    ),
+                    errors={"vin": "invalid_vin"},
+                )
+            user_input["vin"] = vin
+
             # Use VIN as unique_id → prevents adding the same VIN twice.
-            await self.async_set_unique_id(user_input["vin"])
+            await self.async_set_unique_id(vin)
             self._abort_if_unique_id_configured()
 
+            # Resolve the OCR endpoint once, at submit time, so sensor.py
+            # can read the finished URL instead of re-parsing tesseract_ip
+            user_input["ocr_url"] = build_ocr_url(
+                user_input.get("tesseract_ip", "")
+            )
+
             # Create the config entry.
             # Everything from user_input goes into .data
             return self.async_create_entry(
                 title=user_input[CONF_NAME],  # What shows in the integrations list
-                data=user_input,              # Store vin + tesseract_ip here
+                data=user_input,              # Store vin + tesseract_ip + ocr_url here
             )
 
         # First time we get here, show the form to the user.
         return self.async_show_form(
             step_id="user",  # Name of this step
-            data_schema=vol.Schema(
-                {
-                    vol.Required(CONF_NAME): str,   # Friendly name of the integration
-                    vol.Required("vin"): str,       # VIN to monitor
-                    # NEW: tesseract_ip instead of ocr_api_key
-                    #
-                    # You can enter either:
-                    #   - just an IP/hostname → e.g. 192.168.68.144
-                    #   - or a full URL     → e.g. http://192.168.68.144:8000/ocr/file?lang=eng
-                    #
-                    # We keep it optional so the integration still works with manual captcha
-                    # or with a default URL from const.py / sensor.py.
-                    vol.Optional("tesseract_ip", default=""): str,
-                }
+            data_schema=_user_schema(),
+        )
+
+    async def async_step_reconfigure(self, user_input=None):
+        """Edit name, VIN and tesseract_ip for an existing entry at once.
+
+        One dialog and one config-entry write, instead of the two-step
+        delete-and-re-add (or options-dialog) dance.
+        """
+        entry = self._get_reconfigure_entry()
+
+        if user_input is not None:
+            vin = user_input["vin"].strip().upper()
+            errors = {}
+            if not _VIN_RE.match(vin):
+                errors["vin"] = "invalid_vin"
+            else:
+                # Duplicate detection via the unique_id machinery, same
+                # as the user step. Guarded to the changed-VIN case so
+                # the entry being reconfigured never trips the check
+                # against itself.
+                await self.async_set_unique_id(vin)
+                if vin != entry.unique_id:
+                    self._abort_if_unique_id_configured()
+
+            if not errors:
+                user_input["vin"] = vin
+                user_input["ocr_url"] = build_ocr_url(
+                    user_input.get("tesseract_ip", "")
+                )
+                # unique_id must follow the VIN; otherwise re-adding the
+                # old VIN is wrongly refused and the new one can be
+                # added twice.
+                return self.async_update_reload_and_abort(
+                    entry,
+                    unique_id=vin,
+                    title=user_input[CONF_NAME],
+                    data_updates=user_input,
+                    # sensor.py prefers options["ocr_url"] over data –
+                    # an endpoint persisted by an earlier options dialog
+                    # would silently shadow the one set here, so bring
+                    # the options in line with the reconfigured values.
+                    options_updates={
+                        "tesseract_ip": user_input.get("tesseract_ip", ""),
+                        "ocr_url": None,
+                    },
+                )
+
+            suggested = user_input
+        else:
+            errors = {}
+            suggested = {
+                CONF_NAME: entry.title,
+                "vin": entry.data.get("vin", ""),
+                "tesseract_ip": (
+                    entry.options.get("tesseract_ip")
+                    or entry.data.get("tesseract_ip", "")
+                ),
+            }
+
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=self.add_suggested_values_to_schema(
+                _user_schema(), suggested
             ),
+            errors=errors,
         )
 
     # ---------- OPTIONS FLOW HOOK ----------
@@ -61,15 +179,16 @@ class RarItpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         This makes the "Configure" button open our custom options dialog
         instead of doing nothing.
         """
-        return RarItpOptionsFlow(config_entry)
+        return RarItpOptionsFlow()
 
 
 class RarItpOptionsFlow(config_entries.OptionsFlow):
-    """Handle options (editable after setup) for RAR ITP Checker."""
+    """Handle options (editable after setup) for RAR ITP Checker.
 
-    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
-        # Keep a reference to the config entry so we can read .data and .options
-        self.config_entry = config_entry
+    No __init__ override: HA provides self.config_entry on OptionsFlow,
+    and assigning it ourselves triggers a deprecation warning on every
+    dialog open.
+    """
 
     async def async_step_init(self, user_input=None):
         """
@@ -79,13 +198,20 @@ class RarItpOptionsFlow(config_entries.OptionsFlow):
         """
         if user_input is not None:
             # User pressed Submit:
-            # - we store only tesseract_ip in options
+            # - we store tesseract_ip + its derived ocr_url in options
             # - anything else stays in config_entry.data
             tesseract_ip = user_input.get("tesseract_ip", "").strip()
 
             return self.async_create_entry(
                 title="",                    # Title not shown in UI for options
-                data={"tesseract_ip": tesseract_ip},  # Stored in config_entry.options
+                data={
+                    "tesseract_ip": tesseract_ip,
+                    # An emptied field must keep falling back to the
+                    # install-time endpoint in .data – build_ocr_url("")
+                    # would pin the default URL here instead, so store
+                    # None and let sensor.py's or-chain fall through.
+                    "ocr_url": build_ocr_url(tesseract_ip) if tesseract_ip else None,
+                },  # Stored in config_entry.options
             )
 
         # When the form is first shown, pre-fill it with the current value.
@@ -100,12 +226,11 @@ class RarItpOptionsFlow(config_entries.OptionsFlow):
             or self.config_entry.data.get("tesseract_ip", "")
         )
 
-        # Show the options form
+        # Show the options form – static schema, pre-filled via
+        # suggested values so the Schema object is shared across renders
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema(
-                {
-                    vol.Optional("tesseract_ip", default=current_tesseract_ip): str,
-                }
+            data_schema=self.add_suggested_values_to_schema(
+                _options_schema(), {"tesseract_ip": current_tesseract_ip}
             ),
         )
@@ -1,3 +1,5 @@
+from urllib.parse import urlsplit
+
 DOMAIN = "rar_itp_checker"  # integration domain used in HA internals
 
 BASE_URL = "https://prog.rarom.ro/rarpol/rarpol.asp"  # RAR query page
@@ -12,3 +14,28 @@ DEFAULT_SCAN_INTERVAL = 720
 # You can leave this as-is; if "tesseract_ip" is empty, the integration
 # will fall back to this value.
 DEFAULT_LOCAL_OCR_API_URL = "http://127.0.0.1:8000/ocr/file?lang=eng"
+
+# Pre-parsed once at import – build_ocr_url() derives the default port
+# and path/query from here, so the endpoint shape has a single source
+# of truth instead of a second hand-written copy of the URL.
+DEFAULT_LOCAL_OCR_API_SPLIT = urlsplit(DEFAULT_LOCAL_OCR_API_URL)
+DEFAULT_LOCAL_OCR_API_PORT = DEFAULT_LOCAL_OCR_API_SPLIT.port
+
+
+def build_ocr_url(tesseract_ip: str) -> str:
+    """Return the canonical OCR endpoint for a "tesseract_ip" value.
+
+    Empty input falls back to DEFAULT_LOCAL_OCR_API_URL, a full URL is
+    used as-is, and a bare IP/hostname gets the standard port + path.
+    The config flow calls this once at submit time so runtime code can
+    read the finished URL instead of re-parsing the raw value per poll.
+    """
+    raw = (tesseract_ip or "").strip()
+    if not raw:
+        return DEFAULT_LOCAL_OCR_API_URL
+    if raw.startswith(("http://", "https://")):
+        return raw
+    split = DEFAULT_LOCAL_OCR_API_SPLIT
+    return (
+        f"http://{raw}:{DEFAULT_LOCAL_OCR_API_PORT}{split.path}?{split.query}"
+    )
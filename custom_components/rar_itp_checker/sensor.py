@@ -2,33 +2,54 @@
 import asyncio
 import logging
 import os
+import random
 import re
+import struct
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, date
+from typing import Any
 
 import aiohttp
-from bs4 import BeautifulSoup
-from homeassistant.components.sensor import SensorEntity
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.aiohttp_client import (
+    async_create_clientsession,
+    async_get_clientsession,
+)
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
-from homeassistant.util import slugify
+from homeassistant.util import dt as dt_util, slugify
 
 from .const import (
     DOMAIN,                    # integration domain
     BASE_URL,                  # RAR base URL
     DEFAULT_SCAN_INTERVAL,     # scan interval in hours
-    DEFAULT_LOCAL_OCR_API_URL, # default Tesseract URL from const.py
+    build_ocr_url,             # tesseract_ip → canonical OCR endpoint
 )
 
 _LOGGER = logging.getLogger(__name__)
 SCAN_INTERVAL = timedelta(hours=DEFAULT_SCAN_INTERVAL)
 
-# Mutable URL that will be overridden based on the config entry.
-# Start with the default from const.py.
-LOCAL_OCR_API_URL = DEFAULT_LOCAL_OCR_API_URL
+# Precompiled patterns used on every poll – avoids the re-cache lookup per call
+_NON_DIGIT = re.compile(r"\D")
+_DIGITS_1_6 = re.compile(r"\d{1,6}")
+_DIGITS_4 = re.compile(r"\d{4}")
+_SAFE_VIN = re.compile(r"[^A-Za-z0-9]")
+_DATA_EXPIRARII = re.compile("Data expirării", re.I)
+_NOT_FOUND = re.compile(r"nu a fost g[ăa]sit[ăa] nicio înregistrare", re.I)
+_CAPTCHA_REJECTED = re.compile(r"codul de verificare a fost copiat incorect", re.I)
+# Only the result <div> matters on the answer page – skip the rest at parse time
+_RESULT_STRAINER = SoupStrainer("div", id="rezbgcolor")
+# 'valabilă până la d-mmm-yyyy' – tolerant of diacritic stripping/case
+_EXP_RE = re.compile(
+    r"valabil[ăa] p[âa]n[ăa] la\s+(\d{1,2})-([a-z]+)-(\d{4})", re.I
+)
 
 # Month mapping for Romanian date parsing
 MONTH_MAP = {
@@ -51,90 +72,138 @@ class OCRAPIError(Exception):
     """Custom exception for OCR API errors."""
 
 
+# Keep only the newest N debug CAPTCHAs so long-running instances don't
+# fill the /config/www volume.
+MAX_SAVED_CAPTCHAS = 20
+
+# Real CAPTCHAs are a few KB; anything bigger is an error page or junk,
+# so stop reading long before it could balloon in memory.
+MAX_CAPTCHA_BYTES = 256 * 1024
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _is_plausible_captcha(data: bytes) -> bool:
+    """Cheap sanity check on the downloaded CAPTCHA bytes.
+
+    The RAR site serves small PNGs; if we got something tiny, truncated
+    or not a PNG at all (e.g. an error page), fail the attempt locally
+    instead of paying the remote OCR round-trip.
+    """
+    if len(data) < 500 or not data.startswith(_PNG_MAGIC):
+        return False
+    try:
+        # IHDR width/height live in the first chunk right after the magic
+        width, height = struct.unpack(">II", data[16:24])
+    except struct.error:
+        return False
+    return 10 <= width <= 1000 and 10 <= height <= 500
+
+
 def save_captcha_image(image_bytes: bytes, vin: str, attempt: int) -> None:
-    """Save CAPTCHA image under /config/www/rar_itp_captchas for debugging."""
+    """Save CAPTCHA image under /config/www/rar_itp_captchas for debugging.
+
+    Blocking file I/O – callers must run this in an executor thread, not
+    on the event loop.
+    """
     try:
         base_dir = "/config/www/rar_itp_captchas"
         os.makedirs(base_dir, exist_ok=True)
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_vin = re.sub(r"[^A-Za-z0-9]", "_", vin)
+        safe_vin = _SAFE_VIN.sub("_", vin)
         filename = f"captcha_{safe_vin}_attempt{attempt}_{ts}.png"
         path = os.path.join(base_dir, filename)
         with open(path, "wb") as f:
             f.write(image_bytes)
-        _LOGGER.warning("Saved CAPTCHA image to %s", path)
+        _LOGGER.debug("Saved CAPTCHA image to %s", path)
+
+        # Rotate: drop the oldest files beyond the retention limit.
+        # Sort by mtime – filenames start with the VIN, so a lexical
+        # sort would rotate per-VIN instead of oldest-first.
+        saved = sorted(
+            (
+                os.path.join(base_dir, name)
+                for name in os.listdir(base_dir)
+                if name.startswith("captcha_")
+            ),
+            key=os.path.getmtime,
+        )
+        for old_path in saved[:-MAX_SAVED_CAPTCHAS]:
+            os.remove(old_path)
     except Exception as e:
         _LOGGER.error("Failed to save CAPTCHA image: %s", e)
 
 
-async def solve_captcha_with_local_api(image_bytes: bytes) -> str:
+async def solve_captcha_with_local_api(
+    session: aiohttp.ClientSession, ocr_url: str, image_bytes: bytes
+) -> str:
     """
     Solve CAPTCHA using ONLY the local Tesseract HTTP API.
 
-    LOCAL_OCR_API_URL must point to something like:
-      http://192.168.68.144:8000/ocr/file?lang=eng
+    `ocr_url` is the per-entry endpoint built once at setup (with
+    expected_length=4 already appended), something like:
+      http://192.168.68.144:8000/ocr/file?lang=eng&expected_length=4
 
     The endpoint is expected to return JSON like:
       { "text": "1234", "length": 4, ... }
+
+    `session` is Home Assistant's shared aiohttp session so repeated polls
+    reuse pooled keep-alive connections instead of re-handshaking.
     """
     try:
         timeout = aiohttp.ClientTimeout(total=15)
+        url = ocr_url
+
+        form = aiohttp.FormData()
+        form.add_field(
+            "file",
+            image_bytes,
+            filename="captcha.png",
+            content_type="image/png",
+        )
 
-        # Build final URL: always enforce expected_length=4
-        if "?" in LOCAL_OCR_API_URL:
-            url = f"{LOCAL_OCR_API_URL}&expected_length=4"
-        else:
-            url = f"{LOCAL_OCR_API_URL}?expected_length=4"
-
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            form = aiohttp.FormData()
-            form.add_field(
-                "file",
-                image_bytes,
-                filename="captcha.png",
-                content_type="image/png",
-            )
-
-            try:
-                async with session.post(url, data=form) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        msg = f"OCR API HTTP {resp.status}: {text[:200]}"
-                        _LOGGER.warning(msg)
-                        raise OCRAPIError(msg)
-
-                    data = await resp.json()
-                    raw_text = str(data.get("text", "")).strip()
-                    if not raw_text:
-                        _LOGGER.warning(
-                            "OCR API returned empty text, raw response: %s", data
-                        )
-                        raise OCRAPIError("OCR API returned empty text")
-
-                    digits_only = re.sub(r"\D", "", raw_text)
-
-                    # Log what Tesseract actually returned
+        try:
+            async with session.post(url, data=form, timeout=timeout) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    msg = f"OCR API HTTP {resp.status}: {text[:200]}"
+                    _LOGGER.warning(msg)
+                    raise OCRAPIError(msg)
+
+                # orjson decodes the tiny JSON reply in C, without the
+                # charset sniffing aiohttp's resp.json() does first
+                data = orjson.loads(await resp.read())
+                raw_text = str(data.get("text", "")).strip()
+                if not raw_text:
                     _LOGGER.warning(
-                        "Local OCR API result: raw=%r, digits=%r, length=%d",
-                        raw_text,
-                        digits_only,
-                        len(digits_only),
+                        "OCR API returned empty text, raw response: %s", data
                     )
+                    raise OCRAPIError("OCR API returned empty text")
 
-                    if not re.fullmatch(r"\d{1,6}", digits_only):
-                        raise OCRAPIError(
-                            f"Invalid CAPTCHA format from OCR API: raw={raw_text!r}, digits={digits_only!r}"
-                        )
+                digits_only = _NON_DIGIT.sub("", raw_text)
 
-                    # For RAR we expect exactly 4 digits; if more, take first 4.
-                    if len(digits_only) >= 4:
-                        digits_only = digits_only[:4]
+                # Log what Tesseract actually returned
+                _LOGGER.warning(
+                    "Local OCR API result: raw=%r, digits=%r, length=%d",
+                    raw_text,
+                    digits_only,
+                    len(digits_only),
+                )
 
-                    return digits_only
+                if not _DIGITS_1_6.fullmatch(digits_only):
+                    raise OCRAPIError(
+                        f"Invalid CAPTCHA format from OCR API: raw={raw_text!r}, digits={digits_only!r}"
+                    )
+
+                # For RAR we expect exactly 4 digits; if more, take first 4.
+                if len(digits_only) >= 4:
+                    digits_only = digits_only[:4]
 
-            except asyncio.TimeoutError:
-                _LOGGER.warning("Local OCR API timeout when calling %s", url)
-                raise OCRAPIError("OCR API timeout")
+                return digits_only
+
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Local OCR API timeout when calling %s", url)
+            raise OCRAPIError("OCR API timeout")
 
     except Exception as e:
         _LOGGER.warning("OCR processing via local API failed: %s", str(e))
@@ -142,7 +211,7 @@ async def solve_captcha_with_local_api(image_bytes: bytes) -> str:
 
 
 def _build_form_data_from_page(
-    soup: BeautifulSoup, vin: str, captcha_code: str
+    soup: BeautifulSoup, vin: str, captcha_code: str, cache: dict | None = None
 ) -> tuple[str, dict]:
     """
     Build POST data from the actual form on the RAR page.
@@ -150,6 +219,11 @@ def _build_form_data_from_page(
     - Reads the <form> and all <input name="..."> values
     - Overrides only VIN + CAPTCHA fields
     - Returns (post_url, form_data)
+
+    `cache` is an optional per-entry dict; once the form has been parsed
+    the resolved POST URL and static (non-hidden) inputs are cached there
+    so later polls only re-read the hidden token fields from the fresh
+    page.
     """
     form_el = soup.find("form", attrs={"name": "frm"})
     if not form_el:
@@ -157,34 +231,50 @@ def _build_form_data_from_page(
     if not form_el:
         raise UpdateFailed("Unable to find form element on RAR page")
 
-    # Determine POST URL
-    action = form_el.get("action") or ""
-    if action.startswith("http"):
-        post_url = action
+    if cache and "post_url" in cache:
+        # Warm cache: only hidden fields (viewstate-like tokens) can
+        # rotate per GET – everything else is static across polls.
+        post_url = cache["post_url"]
+        form_data: dict[str, str] = dict(cache["static_inputs"])
+        for inp in form_el.select('input[type="hidden"][name]'):
+            form_data[inp["name"]] = inp.get("value", "")
     else:
-        if "#" in action:
-            action_clean = action.split("#", 1)[0]
+        # Determine POST URL
+        action = form_el.get("action") or ""
+        if action.startswith("http"):
+            post_url = action
         else:
-            action_clean = action
-
-        if action_clean:
-            if action_clean.startswith("/"):
-                post_url = f"https://prog.rarom.ro{action_clean}"
+            if "#" in action:
+                action_clean = action.split("#", 1)[0]
             else:
-                base_root = BASE_URL.rsplit("/", 1)[0]
-                post_url = f"{base_root}/{action_clean}"
-        else:
-            post_url = BASE_URL
+                action_clean = action
+
+            if action_clean:
+                if action_clean.startswith("/"):
+                    post_url = f"https://prog.rarom.ro{action_clean}"
+                else:
+                    base_root = BASE_URL.rsplit("/", 1)[0]
+                    post_url = f"{base_root}/{action_clean}"
+            else:
+                post_url = BASE_URL
 
-    inputs = form_el.find_all("input")
-    form_data: dict[str, str] = {}
+        # Single CSS selector picks only named inputs – no per-node name check
+        form_data = {
+            inp["name"]: inp.get("value", "")
+            for inp in form_el.select("input[name]")
+        }
 
-    for inp in inputs:
-        name = inp.get("name")
-        if not name:
-            continue
-        value = inp.get("value", "")
-        form_data[name] = value
+        if cache is not None:
+            cache["post_url"] = post_url
+            cache["static_inputs"] = {
+                name: value
+                for name, value in form_data.items()
+                if name
+                not in {
+                    inp["name"]
+                    for inp in form_el.select('input[type="hidden"][name]')
+                }
+            }
 
     # Override VIN field
     if "nr_id" in form_data:
@@ -215,189 +305,316 @@ def _build_form_data_from_page(
     return post_url, form_data
 
 
-async def fetch_itp(vin: str) -> dict:
-    """Fetch ITP data from RAR site with robust CAPTCHA handling."""
-    timeout = aiohttp.ClientTimeout(total=30)
-    headers = {
-        "User-Agent": "Mozilla/5.0 (HA RAR ITP Checker)",
-        "Referer": BASE_URL,
-        "Origin": "https://prog.rarom.ro",
-    }
+# Request settings shared by every call to RAR – built once at import
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (HA RAR ITP Checker)",
+    "Referer": BASE_URL,
+    "Origin": "https://prog.rarom.ro",
+}
+
 
-    async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+async def _one_try(
+    session: aiohttp.ClientSession,
+    ocr_session: aiohttp.ClientSession,
+    ocr_url: str,
+    vin: str,
+    attempt: int,
+    form_cache: dict | None = None,
+) -> str:
+    """Run one complete page → CAPTCHA → OCR → POST cycle against RAR.
+
+    `session` carries the RAR cookie jar for this cycle and must not be
+    shared with any concurrent cycle; `ocr_session` talks to the
+    cookieless OCR API and may be HA's shared session.
+
+    Returns the result HTML on success, raises UpdateFailed otherwise.
+    On OCR-side failures the already-downloaded CAPTCHA image is re-read
+    once before giving up, so an OCR hiccup does not cost another HTML
+    round-trip + image download.
+    """
+    # 1) Load initial page to get a CAPTCHA image and the form
+    async with session.get(
+        BASE_URL, timeout=_REQUEST_TIMEOUT, headers=_REQUEST_HEADERS
+    ) as response:
+        if response.status != 200:
+            raise UpdateFailed(
+                f"Initial request failed: HTTP {response.status}"
+            )
+        html = await response.text()
+
+    soup = BeautifulSoup(html, "lxml")
+
+    captcha_img = soup.find("img", id="imgVerf")
+    if not captcha_img or not captcha_img.get("src"):
+        _LOGGER.debug("CAPTCHA HTML: %s", str(captcha_img))
+        raise UpdateFailed("CAPTCHA image not found in page")
+
+    captcha_src = captcha_img["src"]
+    if captcha_src.startswith("http"):
+        captcha_url = captcha_src
+    else:
+        captcha_url = (
+            f"https://prog.rarom.ro/rarpol/{captcha_src.lstrip('/')}"
+        )
+
+    _LOGGER.debug("Downloading CAPTCHA from: %s", captcha_url)
+    async with session.get(
+        captcha_url, timeout=_REQUEST_TIMEOUT, headers=_REQUEST_HEADERS
+    ) as cap_resp:
+        if cap_resp.status != 200:
+            raise UpdateFailed(
+                f"CAPTCHA download failed: HTTP {cap_resp.status}"
+            )
+        # Stream in chunks with a hard size cap instead of an unbounded
+        # read – a misbehaving response gets dropped after 256 KB.
+        buf = bytearray()
+        async for chunk in cap_resp.content.iter_chunked(8192):
+            buf.extend(chunk)
+            if len(buf) > MAX_CAPTCHA_BYTES:
+                raise UpdateFailed(
+                    f"CAPTCHA download exceeded {MAX_CAPTCHA_BYTES} bytes, "
+                    "aborting"
+                )
+        captcha_content = bytes(buf)
+
+    # Save captcha locally for debugging – only when debug logging is on,
+    # and off the event loop (blocking file I/O)
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        await asyncio.to_thread(
+            save_captcha_image, captcha_content, vin, attempt
+        )
+
+    if not _is_plausible_captcha(captcha_content):
+        raise UpdateFailed(
+            f"Implausible CAPTCHA image ({len(captcha_content)} bytes), "
+            "skipping OCR call"
+        )
+
+    # 2) Solve CAPTCHA via local Tesseract HTTP API; one extra read of
+    # the cached image before failing the whole try
+    captcha_text = ""
+    for ocr_try in range(2):
         try:
-            _LOGGER.info("Starting ITP check for VIN: %s", vin)
+            captcha_text = await solve_captcha_with_local_api(
+                ocr_session, ocr_url, captcha_content
+            )
+            break
+        except OCRAPIError as err:
+            _LOGGER.warning(
+                "Local OCR API failed (attempt %d, read %d): %s",
+                attempt,
+                ocr_try + 1,
+                err,
+            )
+            if ocr_try == 1:
+                raise UpdateFailed(f"OCR API failed: {err}")
 
-            result_text = ""
+    if not captcha_text:
+        raise UpdateFailed("CAPTCHA OCR returned empty result")
 
-            # CAPTCHA handling with retries
-            for attempt in range(1, 4):  # attempts 1..3
-                try:
-                    # 1) Load initial page to get a CAPTCHA image and the form
-                    async with session.get(BASE_URL) as response:
-                        if response.status != 200:
-                            raise UpdateFailed(
-                                f"Initial request failed: HTTP {response.status}"
-                            )
-                        html = await response.text()
-
-                    soup = BeautifulSoup(html, "html.parser")
-
-                    captcha_img = soup.find("img", id="imgVerf")
-                    if not captcha_img or not captcha_img.get("src"):
-                        _LOGGER.debug("CAPTCHA HTML: %s", str(captcha_img))
-                        raise UpdateFailed("CAPTCHA image not found in page")
-
-                    captcha_src = captcha_img["src"]
-                    if captcha_src.startswith("http"):
-                        captcha_url = captcha_src
-                    else:
-                        captcha_url = (
-                            f"https://prog.rarom.ro/rarpol/{captcha_src.lstrip('/')}"
-                        )
-
-                    _LOGGER.debug("Downloading CAPTCHA from: %s", captcha_url)
-                    async with session.get(captcha_url) as cap_resp:
-                        if cap_resp.status != 200:
-                            raise UpdateFailed(
-                                f"CAPTCHA download failed: HTTP {cap_resp.status}"
-                            )
-                        captcha_content = await cap_resp.read()
-
-                    # Save captcha locally for debugging
-                    save_captcha_image(captcha_content, vin, attempt)
-
-                    # 2) Solve CAPTCHA via local Tesseract HTTP API
-                    try:
-                        captcha_text = await solve_captcha_with_local_api(
-                            captcha_content
-                        )
-                    except OCRAPIError as err:
-                        _LOGGER.warning(
-                            "Local OCR API failed (attempt %d): %s",
-                            attempt,
-                            err,
-                        )
-                        raise UpdateFailed(f"OCR API failed: {err}")
-
-                    if not captcha_text:
-                        raise UpdateFailed("CAPTCHA OCR returned empty result")
-
-                    clean_captcha = re.sub(r"\D", "", captcha_text)
-
-                    # Log what we’re about to send to RAR
-                    _LOGGER.warning(
-                        "Attempt %d: VIN=%s, using CAPTCHA code=%r (clean=%r)",
-                        attempt,
-                        vin,
-                        captcha_text,
-                        clean_captcha,
-                    )
+    clean_captcha = _NON_DIGIT.sub("", captcha_text)
 
-                    if not re.fullmatch(r"\d{4}", clean_captcha):
-                        raise UpdateFailed(
-                            f"Invalid CAPTCHA output after cleaning: {clean_captcha}"
-                        )
+    # Log what we’re about to send to RAR
+    _LOGGER.warning(
+        "Attempt %d: VIN=%s, using CAPTCHA code=%r (clean=%r)",
+        attempt,
+        vin,
+        captcha_text,
+        clean_captcha,
+    )
 
-                    # 3) Build form data from real page form
-                    post_url, form_data = _build_form_data_from_page(
-                        soup, vin, clean_captcha
-                    )
+    if not _DIGITS_4.fullmatch(clean_captcha):
+        raise UpdateFailed(
+            f"Invalid CAPTCHA output after cleaning: {clean_captcha}"
+        )
 
-                    _LOGGER.debug(
-                        "Posting to %s with verif_cod=%s, nr_id=%s; all keys=%s",
-                        post_url,
-                        form_data.get("verif_cod"),
-                        form_data.get("nr_id"),
-                        list(form_data.keys()),
-                    )
+    # 3) Build form data from real page form
+    post_url, form_data = _build_form_data_from_page(
+        soup, vin, clean_captcha, cache=form_cache
+    )
 
-                    # 4) Submit form to RAR
-                    async with session.post(
-                        post_url, data=form_data
-                    ) as result_response:
-                        if result_response.status != 200:
-                            raise UpdateFailed(
-                                f"POST request failed: HTTP {result_response.status}"
-                            )
-                        result_text = await result_response.text()
-
-                        if (
-                            "codul de verificare a fost copiat incorect"
-                            in result_text.lower()
-                        ):
-                            _LOGGER.warning(
-                                "CAPTCHA validation failed on server (attempt %d) for VIN %s, code used: %s",
-                                attempt,
-                                vin,
-                                clean_captcha,
-                            )
-                            # Wrong CAPTCHA → retry loop
-                            raise UpdateFailed("CAPTCHA validation failed")
-
-                        # Success – break retry loop
-                        break
-
-                except UpdateFailed as e:
-                    if attempt == 3:
-                        # Last attempt → bubble up
-                        raise UpdateFailed(f"Failed after 3 attempts: {str(e)}")
-                    _LOGGER.debug("Attempt %d failed, retrying: %s", attempt, e)
-                    await asyncio.sleep(2)
-                    continue
-
-            # ---- Parse results from RAR HTML ----
-            result_soup = BeautifulSoup(result_text, "html.parser")
-            result_div = result_soup.find("div", id="rezbgcolor")
-            content_text = (
-                result_div.get_text(separator="\n", strip=True)
-                if result_div
-                else result_text
+    _LOGGER.debug(
+        "Posting to %s with verif_cod=%s, nr_id=%s; all keys=%s",
+        post_url,
+        form_data.get("verif_cod"),
+        form_data.get("nr_id"),
+        list(form_data.keys()),
+    )
+
+    # 4) Submit form to RAR
+    async with session.post(
+        post_url, data=form_data, timeout=_REQUEST_TIMEOUT, headers=_REQUEST_HEADERS
+    ) as result_response:
+        if result_response.status != 200:
+            raise UpdateFailed(
+                f"POST request failed: HTTP {result_response.status}"
             )
-            lower = content_text.lower()
+        result_text = await result_response.text()
 
-            # Default values
-            status = "Not Found"
-            expiration_date = "Unknown"
+    if _CAPTCHA_REJECTED.search(result_text):
+        _LOGGER.warning(
+            "CAPTCHA validation failed on server (attempt %d) for VIN %s, code used: %s",
+            attempt,
+            vin,
+            clean_captcha,
+        )
+        raise UpdateFailed("CAPTCHA validation failed")
+
+    return result_text
+
+
+async def fetch_itp(
+    session: aiohttp.ClientSession,
+    ocr_url: str,
+    vin: str,
+    form_cache: dict | None = None,
+    spec_session: aiohttp.ClientSession | None = None,
+    ocr_session: aiohttp.ClientSession | None = None,
+) -> dict:
+    """Fetch ITP data from RAR site with robust CAPTCHA handling.
+
+    `session` is this entry's own RAR session: the verification code is
+    bound to the ASP session cookie, so no two concurrent cycles – in
+    this entry or another one – may share a jar. `ocr_session` (HA's
+    shared session, defaulting to `session`) is used for the cookieless
+    OCR API so those calls still reuse pooled connections.
+    `ocr_url` is this entry's Tesseract API endpoint.
+
+    When `spec_session` is given, a second speculative attempt is raced
+    against the first on that jar and whichever succeeds first wins –
+    an OCR misread then costs one extra OCR call instead of a serial
+    retry + backoff. A third sequential attempt is the fallback.
+    """
+    if ocr_session is None:
+        ocr_session = session
+    try:
+        _LOGGER.info("Starting ITP check for VIN: %s", vin)
 
-            if "nu a fost găsită nicio înregistrare" not in lower:
-                status = "Valid"
+        result_text: str | None = None
+        last_err: UpdateFailed | None = None
 
-                # New format parsing: 'valabilă până la d-mmm-yyyy'
-                if "valabilă până la" in lower:
-                    try:
-                        fragment = lower.split("valabilă până la", 1)[1]
-                        raw_date = fragment.split()[0].strip().strip(".")
-                        day, month, year = raw_date.split("-")
-                        expiration_date = (
-                            f"{year}-{MONTH_MAP.get(month, '01')}-{day.zfill(2)}"
-                        )
-                    except Exception as e:
-                        _LOGGER.warning("Failed to parse expiration date: %s", e)
-
-                # Fallback old format parsing
-                elif "data expirării" in lower:
+        # Speculative double-request: dispatch two independent attempts
+        # and take whichever completes successfully first. Attempt 2 gets
+        # its own session (isolated cookie jar – see docstring).
+        pending = {
+            asyncio.ensure_future(
+                _one_try(session, ocr_session, ocr_url, vin, 1, form_cache)
+            )
+        }
+        if spec_session is not None:
+            pending.add(
+                asyncio.ensure_future(
+                    _one_try(
+                        spec_session, ocr_session, ocr_url, vin, 2, form_cache
+                    )
+                )
+            )
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
                     try:
-                        node = result_soup.find(
-                            text=lambda t: "Data expirării" in t
-                        )
-                        if node:
-                            raw = node.find_next().get_text(strip=True)
-                            day, month, year = raw.split(".")
-                            expiration_date = f"{year}-{month}-{day}"
-                    except Exception as e:
-                        _LOGGER.warning("Failed to parse old-format date: %s", e)
-
-            return {
-                "vin": vin,
-                "status": status,
-                "expiration_date": expiration_date,
-                "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
+                        result_text = task.result()
+                    except UpdateFailed as e:
+                        last_err = e
+                if result_text is not None:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if result_text is None:
+            # Both raced attempts failed → one last sequential try
+            _LOGGER.debug(
+                "Both raced attempts failed (%s), trying once more", last_err
+            )
+            # Two attempts already failed – back off with jitter so all
+            # instances don't hammer RAR/OCR in lockstep
+            await asyncio.sleep(min(8, 2 ** 2) + random.random())
+            try:
+                result_text = await _one_try(
+                    session,
+                    ocr_session,
+                    ocr_url,
+                    vin,
+                    attempt=3,
+                    form_cache=form_cache,
+                )
+            except UpdateFailed as e:
+                raise UpdateFailed(f"Failed after 3 attempts: {str(e)}")
+
+        # ---- Parse results from RAR HTML ----
+        result_soup = BeautifulSoup(
+            result_text, "lxml", parse_only=_RESULT_STRAINER
+        )
+        result_div = result_soup.div
+        content_text = (
+            result_div.get_text(separator="\n", strip=True)
+            if result_div
+            else result_text
+        )
+        # Default values
+        status = "Not Found"
+        expiration_date = "Unknown"
+
+        # Case-insensitive regex searches over the original text – no
+        # .lower() copy of the whole result page needed
+        if not _NOT_FOUND.search(content_text):
+            status = "Valid"
+
+            # New format parsing: 'valabilă până la d-mmm-yyyy' – one
+            # regex pass instead of a split()/strip() chain
+            if m := _EXP_RE.search(content_text):
+                day, month, year = m.groups()
+                expiration_date = (
+                    f"{year}-{MONTH_MAP.get(month.lower(), '01')}-{day.zfill(2)}"
+                )
+
+            # Fallback old format parsing
+            elif _DATA_EXPIRARII.search(content_text):
+                try:
+                    # When the result <div> is missing, content_text came
+                    # from the raw page – the strained tree is empty then,
+                    # so search the full document like the old code did.
+                    search_soup = (
+                        result_soup
+                        if result_div
+                        else BeautifulSoup(result_text, "lxml")
+                    )
+                    node = search_soup.find(string=_DATA_EXPIRARII)
+                    if node:
+                        raw = node.find_next().get_text(strip=True)
+                        day, month, year = raw.split(".")
+                        expiration_date = f"{year}-{month}-{day}"
+                except Exception as e:
+                    _LOGGER.warning("Failed to parse old-format date: %s", e)
+
+        # Parse the expiration date once here instead of strptime-ing it
+        # on every native_value read of the days-left sensor.
+        expiration_date_obj: date | None = None
+        if expiration_date != "Unknown":
+            try:
+                expiration_date_obj = datetime.strptime(
+                    expiration_date, "%Y-%m-%d"
+                ).date()
+            except ValueError:
+                expiration_date_obj = None
+
+        return {
+            "vin": vin,
+            "status": status,
+            "expiration_date": expiration_date,
+            "expiration_date_obj": expiration_date_obj,
+            # tz-aware: the timestamp device class rejects naive values
+            "last_checked": dt_util.now(),
+        }
 
-        except Exception as err:
-            _LOGGER.error("ITP check failed for %s: %s", vin, err, exc_info=True)
-            raise UpdateFailed(f"ITP check failed: {err}") from err
+    except Exception as err:
+        _LOGGER.error("ITP check failed for %s: %s", vin, err, exc_info=True)
+        raise UpdateFailed(f"ITP check failed: {err}") from err
 
 
 def calculate_days_until(expiration_date: str) -> int | None:
@@ -411,147 +628,151 @@ def calculate_days_until(expiration_date: str) -> int | None:
         return None
 
 
-class ITPStatusSensor(CoordinatorEntity, SensorEntity):
-    """ITP status sensor."""
+def _days_left(data: dict) -> int | None:
+    """Days until expiration, preferring the pre-parsed date object."""
+    exp = data.get("expiration_date_obj")
+    if exp is not None:
+        return (exp - date.today()).days
+    # Fallback for data fetched before expiration_date_obj existed
+    return calculate_days_until(data.get("expiration_date"))
+
+
+@dataclass(frozen=True, kw_only=True)
+class ITPEntityDescription(SensorEntityDescription):
+    """Describes one RAR ITP sensor and how to read its value."""
+
+    value_fn: Callable[[dict], Any]
+
+
+SENSOR_DESCRIPTIONS: tuple[ITPEntityDescription, ...] = (
+    ITPEntityDescription(
+        key="itp_status",
+        name="ITP Status",
+        icon="mdi:car",
+        value_fn=lambda data: data.get("status", "unknown"),
+    ),
+    ITPEntityDescription(
+        key="itp_expiration_date",
+        name="ITP Expiration Date",
+        device_class="date",
+        icon="mdi:calendar-star",
+        # The date device class needs a real date (None while unknown),
+        # not the "YYYY-MM-DD"/"Unknown" string kept for attributes.
+        value_fn=lambda data: data.get("expiration_date_obj"),
+    ),
+    ITPEntityDescription(
+        key="itp_last_checked",
+        name="ITP Last Checked",
+        device_class="timestamp",
+        icon="mdi:clock-outline",
+        value_fn=lambda data: data.get("last_checked"),
+    ),
+    ITPEntityDescription(
+        key="itp_days_left",
+        name="ITP Days Left",
+        native_unit_of_measurement="days",
+        state_class="measurement",
+        icon="mdi:calendar-clock",
+        value_fn=_days_left,
+    ),
+)
+
+
+class ITPSensor(CoordinatorEntity, SensorEntity):
+    """Single sensor class driven by an ITPEntityDescription."""
 
-    def __init__(self, coordinator):
+    entity_description: ITPEntityDescription
+
+    def __init__(self, coordinator, description: ITPEntityDescription):
         """Initialize the sensor."""
         super().__init__(coordinator)
-        self.coordinator = coordinator
+        self.entity_description = description
         vin = coordinator.data["vin"]
-        self._attr_name = f"ITP Status {vin}"
-        self._attr_unique_id = slugify(f"itp_status_{vin}")
-        self._attr_icon = "mdi:car"
+        self._attr_name = f"{description.name} {vin}"
+        # Same unique_id scheme as the old per-class sensors, so existing
+        # entity registry entries are preserved.
+        self._attr_unique_id = slugify(f"{description.key}_{vin}")
 
     @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data.get("status", "unknown")
+    def native_value(self):
+        """Return the native value of the sensor."""
+        return self.entity_description.value_fn(self.coordinator.data)
 
     @property
     def extra_state_attributes(self):
-        """Return additional state attributes."""
+        """Return additional state attributes (status sensor only)."""
+        if self.entity_description.key != "itp_status":
+            return None
         return {
             "vin": self.coordinator.data.get("vin"),
             "last_checked": self.coordinator.data.get("last_checked"),
         }
 
 
-class ITPExpirationDateSensor(CoordinatorEntity, SensorEntity):
-    """ITP expiration date sensor."""
-
-    _attr_device_class = "date"
-    _attr_icon = "mdi:calendar-star"
-
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.coordinator = coordinator
-        vin = coordinator.data["vin"]
-        self._attr_name = f"ITP Expiration Date {vin}"
-        self._attr_unique_id = slugify(f"itp_expiration_date_{vin}")
-
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data.get("expiration_date", "Unknown")
-
-
-class ITPLastCheckedSensor(CoordinatorEntity, SensorEntity):
-    """Last checked timestamp sensor."""
-
-    _attr_device_class = "timestamp"
-    _attr_icon = "mdi:clock-outline"
-
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.coordinator = coordinator
-        vin = coordinator.data["vin"]
-        self._attr_name = f"ITP Last Checked {vin}"
-        self._attr_unique_id = slugify(f"itp_last_checked_{vin}")
-
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data.get("last_checked")
-
-
-class ITPDaysLeftSensor(CoordinatorEntity, SensorEntity):
-    """Days left until ITP expiration."""
-
-    _attr_native_unit_of_measurement = "days"
-    _attr_state_class = "measurement"
-    _attr_icon = "mdi:calendar-clock"
-
-    def __init__(self, coordinator):
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.coordinator = coordinator
-        vin = coordinator.data["vin"]
-        self._attr_name = f"ITP Days Left {vin}"
-        self._attr_unique_id = slugify(f"itp_days_left_{vin}")
-
-    @property
-    def native_value(self):
-        """Return the native value of the sensor."""
-        exp_date = self.coordinator.data.get("expiration_date")
-        return calculate_days_until(exp_date)
-
-
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up sensors from config entry with improved error handling."""
     # VIN is stored in config_entry.data from the initial config_flow
     vin = config_entry.data["vin"]  # string VIN for this config entry
 
     # ------------------------------------------------------------------
-    # Read Tesseract endpoint ONLY from "tesseract_ip":
-    #   1. config_entry.options["tesseract_ip"] (set via Configure / OptionsFlow)
-    #   2. config_entry.data["tesseract_ip"]    (set during initial config flow)
-    # If both are empty → we'll fall back to DEFAULT_LOCAL_OCR_API_URL.
+    # Resolve the Tesseract endpoint, per entry:
+    #   1. config_entry.options["ocr_url"]  (persisted by the OptionsFlow)
+    #   2. config_entry.data["ocr_url"]     (persisted by the initial flow)
+    #   3. built from "tesseract_ip" via build_ocr_url – only needed for
+    #      entries created before ocr_url was stored at submit time
     # ------------------------------------------------------------------
-    tesseract_ip = (
-        config_entry.options.get("tesseract_ip", "").strip()
-        or config_entry.data.get("tesseract_ip", "").strip()
+    base_ocr_url = (
+        config_entry.options.get("ocr_url")
+        or config_entry.data.get("ocr_url")
     )
+    if not base_ocr_url:
+        base_ocr_url = build_ocr_url(
+            config_entry.options.get("tesseract_ip", "").strip()
+            or config_entry.data.get("tesseract_ip", "").strip()
+        )
+    _LOGGER.warning("Using Tesseract OCR URL: %s", base_ocr_url)
 
-    # effective_tesseract is what we'll actually use to build the URL
-    effective_tesseract = tesseract_ip
+    # Final URL with expected_length=4 baked in, joined once per entry
+    # instead of on every poll.
+    sep = "&" if "?" in base_ocr_url else "?"
+    ocr_url = f"{base_ocr_url}{sep}expected_length=4"
 
-    # GLOBAL because solve_captcha_with_local_api() reads this module-level var.
-    global LOCAL_OCR_API_URL
+    # Shared aiohttp session from HA – only for the cookieless OCR API,
+    # so those calls reuse pooled keep-alive connections across entries.
+    ocr_session = async_get_clientsession(hass)
 
-    if effective_tesseract:
-        # If user provided a full URL (starts with http:// or https://), use it as-is.
-        if effective_tesseract.startswith("http://") or effective_tesseract.startswith("https://"):
-            LOCAL_OCR_API_URL = effective_tesseract
-        else:
-            # Otherwise assume it's just an IP/hostname and build the full URL.
-            # Example: "192.168.68.144" → "http://192.168.68.144:8000/ocr/file?lang=eng"
-            LOCAL_OCR_API_URL = (
-                f"http://{effective_tesseract}:8000/ocr/file?lang=eng"
-            )
-        _LOGGER.warning("Using Tesseract OCR URL: %s", LOCAL_OCR_API_URL)
-    else:
-        # Nothing set in options or data → fall back to default from const.py
-        LOCAL_OCR_API_URL = DEFAULT_LOCAL_OCR_API_URL
-        _LOGGER.warning(
-            "No tesseract_ip configured; falling back to default OCR URL: %s",
-            LOCAL_OCR_API_URL,
-        )
+    # Entry-owned sessions for RAR traffic: the verification code is
+    # bound to the ASP session cookie, so no two concurrent cycles –
+    # this entry's raced attempts, or other entries refreshing at the
+    # same time (startup, check_now) – may share a jar. One session for
+    # the primary/sequential attempts, one for the speculative attempt.
+    rar_session = async_create_clientsession(hass)
+    spec_session = async_create_clientsession(hass)
+
+    # Per-entry cache of the RAR form skeleton (POST URL + static inputs),
+    # filled on the first successful parse.
+    form_cache: dict = {}
 
     # This function is called by the DataUpdateCoordinator on a schedule
     async def async_update_data():
         """Wrap the fetch with retry logic."""
         for attempt in range(3):
             try:
-                # fetch_itp now only needs the VIN; OCR config is global (LOCAL_OCR_API_URL)
-                return await fetch_itp(vin)
+                # fetch_itp needs this entry's RAR sessions, OCR URL and VIN
+                return await fetch_itp(
+                    rar_session,
+                    ocr_url,
+                    vin,
+                    form_cache,
+                    spec_session,
+                    ocr_session,
+                )
             except UpdateFailed as e:
                 if attempt == 2:  # Last attempt → re-raise
                     raise
                 _LOGGER.debug("Attempt %d failed, retrying: %s", attempt + 1, e)
-                await asyncio.sleep(2)
+                # Exponential backoff + jitter, capped at 8s
+                await asyncio.sleep(min(8, 2 ** (attempt + 1)) + random.random())
                 continue
 
     # Coordinator is responsible for scheduling and caching the data updates
@@ -571,15 +792,21 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         # Tell HA to retry the setup later instead of marking it failed forever
         raise ConfigEntryNotReady from ex
 
-    # Store coordinator by VIN in hass.data so services / other parts can access it
-    hass.data.setdefault(DOMAIN, {})[vin] = {"coordinator": coordinator}
+    # Store coordinator + session by VIN in hass.data so services / other parts can access them
+    hass.data.setdefault(DOMAIN, {})[vin] = {
+        "entry_id": config_entry.entry_id,
+        "coordinator": coordinator,
+        "session": ocr_session,
+        "rar_session": rar_session,
+        "spec_session": spec_session,
+        "ocr_url": ocr_url,
+        "form_cache": form_cache,
+    }
 
     # Create all sensors bound to this coordinator
     sensors = [
-        ITPStatusSensor(coordinator),
-        ITPExpirationDateSensor(coordinator),
-        ITPLastCheckedSensor(coordinator),
-        ITPDaysLeftSensor(coordinator),
+        ITPSensor(coordinator, description)
+        for description in SENSOR_DESCRIPTIONS
     ]
     # Register the entities in Home Assistant
     async_add_entities(sensors, True)